@@ -19,7 +19,7 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
-from image import ImageComponent, ImageData, ImagePSNR
+from zmd.image import ImageComponent, ImageData, ImagePSNR
 
 
 class MainWindow(QWidget):
@@ -524,7 +524,12 @@ class AttackTab(QWidget):
             pass
 
 
-app = QApplication(sys.argv)
-w = MainWindow()
-w.show()
-app.exec()
+def main():
+    app = QApplication(sys.argv)
+    w = MainWindow()
+    w.show()
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Thread scaling of the row-band kernels
+
+Times lsb_encode, lsb_decode, rgb2ycbcr and calculate_psnr on a random image
+for an increasing number of threads and prints the speedup over one thread.
+Run from the repository root:
+
+    python benchmarks/band_scaling.py [--megapixels 25] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zmd.image import ImageComponent, ImageData  # noqa: E402
+from zmd.parallel import BandExecutor  # noqa: E402
+
+
+def best_time(function, repeat: int) -> float:
+    """Returns the best wall time of the function in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def thread_counts(maximum: int) -> list[int]:
+    """Powers of two up to the maximum, including the maximum itself"""
+    counts = [1]
+    while counts[-1] * 2 < maximum:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != maximum:
+        counts.append(maximum)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=25)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-threads", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    side = int(np.sqrt(args.megapixels * 1e6))
+    rng = np.random.default_rng(0)
+    image = Image.fromarray(rng.integers(0, 256, (side, side, 3), dtype=np.uint8))
+    noisy = Image.fromarray(rng.integers(0, 256, (side, side, 3), dtype=np.uint8))
+    watermark = Image.fromarray(rng.integers(0, 2, (64, 64), dtype=np.uint8))
+    image_data = ImageData(image)
+
+    print(f"{side}x{side} image, best of {args.repeat}")
+    print(f"{'threads':>7} {'operation':<15} {'time [ms]':>10} {'speedup':>8}")
+    baseline = {}
+    for threads in thread_counts(args.max_threads):
+        with BandExecutor(threads) as executor:
+            operations = {
+                "lsb_encode": lambda: executor.lsb_encode(
+                    image_data, ImageComponent.RED, watermark, 7
+                ),
+                "lsb_decode": lambda: executor.lsb_decode(
+                    image_data, ImageComponent.RED, 7
+                ),
+                "rgb2ycbcr": lambda: executor.rgb2ycbcr(image_data),
+                "calculate_psnr": lambda: executor.calculate_psnr(image, noisy),
+            }
+            for name, operation in operations.items():
+                elapsed = best_time(operation, args.repeat)
+                baseline.setdefault(name, elapsed)
+                print(
+                    f"{threads:>7} {name:<15} {elapsed * 1000:>10.1f}"
+                    f" {baseline[name] / elapsed:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Cold-start import time of the core package
+
+Every measurement runs in a fresh interpreter, the way a process-pool worker
+starts. Run from the repository root:
+
+    python benchmarks/import_time.py [--runs 10] [--module zmd.image]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in ("PyQt6", "PIL.ImageQt", "PIL.JpegImagePlugin")
+         if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def measure(module: str, runs: int) -> tuple[list[float], set[str]]:
+    """Imports the module in fresh interpreters
+
+    Args:
+        module (str): Module to import
+        runs (int): Number of interpreters to start
+
+    Returns:
+        tuple[list[float], set[str]]: Import times in seconds and the heavy
+            modules loaded as a side effect
+    """
+    times = []
+    heavy = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.split()
+        times.append(float(output[0]))
+        if len(output) > 1:
+            heavy.update(output[1].split(","))
+    return times, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--module",
+        action="append",
+        help="Module to import, may be repeated",
+    )
+    args = parser.parse_args()
+
+    for module in args.module or ["zmd", "zmd.image", "zmd.metrics", "zmd.cache"]:
+        times, heavy = measure(module, args.runs)
+        line = (
+            f"{module:<16} median {statistics.median(times) * 1000:7.1f} ms"
+            f"  min {min(times) * 1000:7.1f} ms"
+        )
+        if heavy:
+            line += f"  loaded: {', '.join(sorted(heavy))}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from zmd.cache import CachedImageData, ResultCache
+from zmd.image import ImageComponent, ImageData, ImagePSNR
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+
+
+@pytest.fixture
+def watermark():
+    rng = np.random.default_rng(1)
+    return Image.fromarray(rng.integers(0, 2, (8, 8), dtype=np.uint8))
+
+
+@pytest.mark.parametrize(
+    "operation, args",
+    [
+        ("jpeg_compress", (50,)),
+        ("image_rotate", (30,)),
+        ("image_resize", (75,)),
+        ("image_flip", ("horizontal",)),
+        ("image_flip", ("vertical",)),
+    ],
+)
+def test_cached_attacks_match_uncached(tmp_path, image, operation, args):
+    cache = ResultCache(tmp_path)
+    expected = ImageData(image)
+    getattr(expected, operation)(*args)
+    for _ in range(2):
+        cached = CachedImageData(image, cache)
+        getattr(cached, operation)(*args)
+        assert np.array_equal(cached.rgb_array, expected.rgb_array)
+        assert np.array_equal(cached.ycbcr_array, expected.ycbcr_array)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("key", [None, 5])
+def test_cached_lsb_matches_uncached(tmp_path, image, watermark, key):
+    cache = ResultCache(tmp_path)
+    expected = ImageData(image)
+    expected.lsb_encode(ImageComponent.GREEN, watermark, 6, key)
+    expected_plane = expected.lsb_decode(ImageComponent.GREEN, 6, key)
+    for _ in range(2):
+        cached = CachedImageData(image, cache)
+        cached.lsb_encode(ImageComponent.GREEN, watermark, 6, key)
+        assert np.array_equal(cached.rgb_array, expected.rgb_array)
+        plane = cached.lsb_decode(ImageComponent.GREEN, 6, key)
+        assert plane.mode == "1"
+        assert np.array_equal(np.asarray(plane), np.asarray(expected_plane))
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_cached_psnr_matches_uncached(tmp_path, image):
+    cache = ResultCache(tmp_path)
+    other = Image.fromarray(np.asarray(image) // 2)
+    expected = ImagePSNR.calculate_psnr(image, other)
+    assert cache.psnr(image, other) == pytest.approx(expected)
+    assert cache.psnr(image, other) == pytest.approx(expected)
+    assert cache.psnr(image, image) == 100
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.hit_rate == pytest.approx(1 / 3)
+
+
+def test_key_depends_on_pixels_operation_and_params():
+    array = np.zeros((4, 4), dtype=np.uint8)
+    key = ResultCache.key("op", [array], value=1)
+    assert key == ResultCache.key("op", [array.copy()], value=1)
+    assert key != ResultCache.key("other", [array], value=1)
+    assert key != ResultCache.key("op", [array], value=2)
+    assert key != ResultCache.key("op", [array + 1], value=1)
+    assert key != ResultCache.key("op", [array.reshape(2, 8)], value=1)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    entry = np.zeros(1000, dtype=np.uint8)
+    cache = ResultCache(tmp_path, max_bytes=10**6)
+    for index, name in enumerate("abc"):
+        cache.put(name, entry)
+        os.utime(tmp_path / f"{name}.npy", (index, index))
+    entry_size = cache.stats()["bytes"] // 3
+
+    # přístup k "a" z něj udělá naposledy použitou položku
+    assert cache.get("a") is not None
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+    cache.put("d", entry)
+    assert cache.stats()["entries"] == 2
+    assert cache.get("d") is not None
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_hit_survives_eviction_after_load(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+    cache.put("a", np.arange(5))
+
+    def evicted(path, *args, **kwargs):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "utime", evicted)
+    assert np.array_equal(cache.get("a"), np.arange(5))
+    assert (cache.hits, cache.misses) == (1, 0)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from zmd.image import ImageComponent, ImageData, keyed_permutation
+from zmd.metrics import BitPlaneMetrics
+
+
+@pytest.fixture
+def images():
+    rng = np.random.default_rng(0)
+    image = Image.fromarray(rng.integers(0, 256, (96, 80, 3), dtype=np.uint8))
+    watermark = Image.fromarray(rng.integers(0, 2, (12, 10), dtype=np.uint8))
+    return image, watermark
+
+
+def test_permutation_golden_vector():
+    """Změna těchto hodnot znamená, že dříve vložené vodoznaky nepůjdou dekódovat"""
+    assert keyed_permutation(1234, (4, 5)).tolist() == [
+        3, 7, 14, 12, 18, 0, 11, 15, 8, 10, 19, 17, 4, 9, 13, 1, 2, 16, 5, 6,
+    ]  # fmt: skip
+    assert keyed_permutation(2**40 + 3, (3, 3)).tolist() == [
+        1, 5, 4, 7, 3, 6, 8, 2, 0,
+    ]  # fmt: skip
+
+
+def test_permutation_is_cached_and_read_only():
+    first = keyed_permutation(7, (30, 40))
+    assert keyed_permutation(7, (30, 40)) is first
+    assert not first.flags.writeable
+    assert np.array_equal(np.sort(first), np.arange(30 * 40))
+
+
+@pytest.mark.parametrize("depth", [0, 7])
+def test_keyed_round_trip(images, depth):
+    image, watermark = images
+    plain = ImageData(image)
+    plain.lsb_encode(ImageComponent.BLUE, watermark, depth)
+    keyed = ImageData(image)
+    keyed.lsb_encode(ImageComponent.BLUE, watermark, depth, key=99)
+
+    decoded = ImageData(keyed.rgb2image()).lsb_decode(
+        ImageComponent.BLUE, depth, key=99
+    )
+    assert np.array_equal(
+        np.asarray(decoded), np.asarray(plain.lsb_decode(ImageComponent.BLUE, depth))
+    )
+    # ostatní bity a složky zůstanou beze změny
+    mask = np.uint8(~(1 << (7 - depth)) & 0xFF)
+    assert np.array_equal(keyed.rgb_array & mask, np.asarray(image) & mask)
+    assert np.array_equal(keyed.rgb_array[:, :, :2], np.asarray(image)[:, :, :2])
+
+
+def test_unkeyed_bit_plane_hides_watermark(images):
+    image, watermark = images
+    reference = BitPlaneMetrics.tile_reference(watermark, (96, 80))
+    plain = ImageData(image)
+    plain.lsb_encode(ImageComponent.RED, watermark, 7)
+    keyed = ImageData(image)
+    keyed.lsb_encode(ImageComponent.RED, watermark, 7, key=99)
+
+    def ber(image_data, key=None):
+        plane = image_data.lsb_decode(ImageComponent.RED, 7, key=key)
+        return BitPlaneMetrics.bit_error_rate(
+            BitPlaneMetrics.pack(plane), reference, 80
+        )
+
+    assert ber(plain) == 0
+    assert ber(keyed, key=99) == 0
+    assert abs(ber(keyed) - 0.5) < 0.05
+    assert abs(ber(keyed, key=98) - 0.5) < 0.05
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from zmd.metrics import BitPlaneMetrics
+
+HEIGHT, WIDTH = 37, 53
+
+
+@pytest.fixture
+def planes():
+    rng = np.random.default_rng(0)
+    extracted = rng.integers(0, 2, (HEIGHT, WIDTH), dtype=np.uint8)
+    references = rng.integers(0, 2, (4, HEIGHT, WIDTH), dtype=np.uint8)
+    references[0] = extracted
+    return extracted, references
+
+
+def pack_batch(references: np.ndarray) -> np.ndarray:
+    return np.stack([BitPlaneMetrics.pack(reference) for reference in references])
+
+
+def test_bit_error_rate_matches_unpacked(planes):
+    extracted, references = planes
+    ber = BitPlaneMetrics.bit_error_rate(
+        BitPlaneMetrics.pack(extracted), pack_batch(references), WIDTH
+    )
+    expected = (references != extracted).mean(axis=(1, 2))
+    assert np.allclose(ber, expected)
+    assert ber[0] == 0
+
+
+def test_bit_error_rate_requires_matching_width(planes):
+    extracted, references = planes
+    with pytest.raises(ValueError):
+        BitPlaneMetrics.bit_error_rate(
+            BitPlaneMetrics.pack(extracted), pack_batch(references), 64
+        )
+
+
+def test_normalized_correlation_matches_unpacked(planes):
+    extracted, references = planes
+    nc = BitPlaneMetrics.normalized_correlation(
+        BitPlaneMetrics.pack(extracted), pack_batch(references)
+    )
+    expected = (references * extracted).sum(axis=(1, 2)) / np.sqrt(
+        extracted.sum() * references.sum(axis=(1, 2))
+    )
+    assert np.allclose(nc, expected)
+    assert np.isclose(nc[0], 1)
+
+
+def test_ber_map_matches_unpacked_with_edge_tiles(planes):
+    extracted, references = planes
+    tile_height, tile_width = 10, 16
+    ber_map = BitPlaneMetrics.ber_map(
+        BitPlaneMetrics.pack(extracted),
+        pack_batch(references),
+        (tile_height, tile_width),
+        WIDTH,
+    )
+    assert ber_map.shape == (4, 4, 4)
+    for y in range(4):
+        for x in range(4):
+            rows = slice(y * tile_height, (y + 1) * tile_height)
+            cols = slice(x * tile_width, (x + 1) * tile_width)
+            expected = (references[:, rows, cols] != extracted[rows, cols]).mean(
+                axis=(1, 2)
+            )
+            assert np.allclose(ber_map[:, y, x], expected)
+
+
+def test_pack_and_tile_reference_agree_on_l_images():
+    watermark = Image.fromarray(
+        np.random.default_rng(1).integers(0, 2, (6, 10), dtype=np.uint8), mode="L"
+    )
+    tiled = BitPlaneMetrics.tile_reference(watermark, (12, 20))
+    assert tiled.sum() > 0
+    assert np.array_equal(
+        BitPlaneMetrics.pack(watermark),
+        BitPlaneMetrics.tile_reference(watermark, (6, 10)),
+    )
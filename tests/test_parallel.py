@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+from zmd.image import ImageComponent, ImageData, ImagePSNR
+from zmd.parallel import BandExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def open_image(name: str) -> Image.Image:
+    return Image.open(os.path.join(ROOT, name))
+
+
+def test_bands_cover_rows():
+    with BandExecutor(4, min_band_rows=10) as executor:
+        bands = executor.bands(105)
+    assert len(bands) == 4
+    assert bands[0].start == 0 and bands[-1].stop == 105
+    assert all(a.stop == b.start for a, b in zip(bands, bands[1:]))
+
+
+def test_banded_lsb_matches_serial():
+    image = open_image("Lenna.png").convert("RGB")
+    serial = ImageData(image)
+    serial.lsb_encode(ImageComponent.GREEN, open_image("vut.png"), 5)
+
+    banded = ImageData(image)
+    with BandExecutor(8, min_band_rows=8) as executor:
+        for _ in range(20):
+            # vodoznak čerstvě otevřený, ještě nenačtený
+            banded.rgb_array = np.asarray(image).copy()
+            executor.lsb_encode(banded, ImageComponent.GREEN, open_image("vut.png"), 5)
+            assert np.array_equal(banded.rgb_array, serial.rgb_array)
+
+        decoded = executor.lsb_decode(banded, ImageComponent.GREEN, 5)
+        assert np.array_equal(
+            np.asarray(decoded),
+            np.asarray(serial.lsb_decode(ImageComponent.GREEN, 5)),
+        )
+        assert np.array_equal(executor.rgb2ycbcr(banded), serial.rgb2ycbcr())
+        assert np.isclose(
+            executor.calculate_psnr(image, banded.rgb2image()),
+            ImagePSNR.calculate_psnr(image, serial.rgb2image()),
+        )
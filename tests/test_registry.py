@@ -0,0 +1,48 @@
+import numpy as np
+from PIL import Image
+
+from zmd.registry import WatermarkRegistry
+
+
+def test_save_load_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    watermarks = rng.integers(0, 2, (1000, 16, 24), dtype=np.uint8)
+    registry = WatermarkRegistry((16, 24))
+    registry.register_many([f"customer{i}" for i in range(1000)], list(watermarks))
+    registry.save(tmp_path)
+
+    loaded = WatermarkRegistry.load(tmp_path)
+    loaded.save(tmp_path)
+    loaded.register("extra", np.ones((16, 24), dtype=np.uint8))
+    loaded.save(tmp_path)
+
+    reloaded = WatermarkRegistry.load(tmp_path)
+    assert len(reloaded) == 1001
+    assert reloaded.period == (16, 24)
+    assert reloaded.match(watermarks[42]) == [("customer42", 0)]
+    assert reloaded.match(np.ones((16, 24)))[0] == ("extra", 0)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_signature_treats_non_zero_as_set():
+    registry = WatermarkRegistry((2, 8))
+    plane = np.zeros((4, 16), dtype=np.uint8)
+    # jeden hlas ze čtyř nesmí přehlasovat ostatní
+    plane[0, 0] = 255
+    plane[0, 1] = plane[0, 9] = plane[2, 1] = 255
+    signature = np.unpackbits(registry.signature(plane))
+    assert signature[0] == 0
+    assert signature[1] == 1
+    assert signature.sum() == 1
+
+
+def test_register_l_image_with_zero_one_values():
+    rng = np.random.default_rng(1)
+    watermarks = rng.integers(0, 2, (3, 8, 16), dtype=np.uint8)
+    registry = WatermarkRegistry((8, 16))
+    registry.register_many(
+        ["a", "b", "c"],
+        [Image.fromarray(watermark, mode="L") for watermark in watermarks],
+    )
+    assert registry.signatures.sum() > 0
+    assert registry.match(watermarks[1] * 255) == [("b", 0)]
@@ -0,0 +1,31 @@
+"""Headless watermarking core
+
+The submodules are imported on first attribute access, so ``import zmd`` stays
+cheap for process-pool workers and never touches the GUI toolkit.
+"""
+from importlib import import_module
+
+_exports = {
+    "ImageComponent": "zmd.image",
+    "ImageData": "zmd.image",
+    "ImagePSNR": "zmd.image",
+    "BitPlaneMetrics": "zmd.metrics",
+    "WatermarkRegistry": "zmd.registry",
+    "ResultCache": "zmd.cache",
+    "CachedImageData": "zmd.cache",
+    "BandExecutor": "zmd.parallel",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str):
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_exports[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,289 @@
+import hashlib
+import os
+import tempfile
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+from zmd.image import ImageComponent, ImageData, ImagePSNR
+
+
+class ResultCache:
+    """Content-addressed on-disk cache of operation results
+
+    Results are stored as raw .npy files named by the hash of the input pixels,
+    the operation name and its parameters. Files are written atomically, so
+    several processes can share one cache directory. When the total size exceeds
+    the limit, the least recently used files (by modification time, which is
+    refreshed on every hit) are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1 << 30):
+        """ResultCache class
+
+        Args:
+            path (str): Cache directory, created when missing
+            max_bytes (optional): Size limit of the cache directory. Defaults to 1 GiB.
+
+        Attributes:
+            hits (int): Number of lookups answered from the cache
+            misses (int): Number of lookups that had to be computed
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Returns the cache statistics
+
+        Returns:
+            dict: Hits, misses, hit rate, number of entries and their total size
+        """
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(entries),
+            "bytes": sum(entry.stat().st_size for entry in entries),
+        }
+
+    @staticmethod
+    def key(operation: str, arrays: list[np.ndarray], **params) -> str:
+        """Computes the cache key of an operation
+
+        Args:
+            operation (str): Operation name
+            arrays (list[np.ndarray]): Input pixel arrays
+            **params: Operation parameters, their repr is hashed
+
+        Returns:
+            str: Hex digest identifying the result
+        """
+        digest = hashlib.blake2b(operation.encode(), digest_size=20)
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            digest.update(f"{array.dtype.str}{array.shape}".encode())
+            digest.update(memoryview(array).cast("B"))
+        digest.update(repr(sorted(params.items())).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> np.ndarray | None:
+        """Loads a cached result
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            np.ndarray | None: The cached array, None when missing
+        """
+        file_path = self._file_path(key)
+        try:
+            result = np.load(file_path, allow_pickle=False)
+        except (FileNotFoundError, ValueError, EOFError):
+            # soubor mohl být mezitím vyřazen jiným procesem
+            self.misses += 1
+            return None
+        try:
+            os.utime(file_path)
+        except FileNotFoundError:
+            # výsledek už je načtený, vyřazení jiným procesem nevadí
+            pass
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: np.ndarray):
+        """Stores a result and evicts the least recently used entries over the limit
+
+        Args:
+            key (str): Cache key
+            result (np.ndarray): The array to store
+        """
+        descriptor, temp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as temp_file:
+                np.save(temp_file, np.asarray(result), allow_pickle=False)
+            os.replace(temp_path, self._file_path(key))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.evict()
+
+    def cached(
+        self,
+        operation: str,
+        arrays: list[np.ndarray],
+        compute: Callable[[], np.ndarray],
+        **params,
+    ) -> np.ndarray:
+        """Returns the cached result of an operation or computes and stores it
+
+        Args:
+            operation (str): Operation name
+            arrays (list[np.ndarray]): Input pixel arrays
+            compute (Callable): Computes the result on a miss
+            **params: Operation parameters
+
+        Returns:
+            np.ndarray: The operation result
+        """
+        key = self.key(operation, arrays, **params)
+        result = self.get(key)
+        if result is None:
+            result = np.asarray(compute())
+            self.put(key, result)
+        return result
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits the limit"""
+        entries = []
+        for entry in self._entries():
+            try:
+                entries.append((entry.stat().st_mtime, entry.stat().st_size, entry))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Removes all cached results"""
+        for entry in self._entries():
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def psnr(self, img1: Image.Image, img2: Image.Image, max_value: int = 255) -> float:
+        """Cached ImagePSNR.calculate_psnr
+
+        Args:
+            img1: The first Image
+            img2: The second Image
+            max_value (optional): Maximum possible value in the image. Defaults to 255.
+
+        Returns:
+            float: Calculated PSNR
+        """
+        result = self.cached(
+            "psnr",
+            [np.asarray(img1), np.asarray(img2)],
+            lambda: ImagePSNR.calculate_psnr(img1, img2, max_value),
+            max_value=max_value,
+        )
+        return float(result)
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.npy")
+
+    def _entries(self) -> list[os.DirEntry]:
+        with os.scandir(self.path) as entries:
+            return [entry for entry in entries if entry.name.endswith(".npy")]
+
+
+class CachedImageData(ImageData):
+    """ImageData whose encode, decode and attack results are read from a ResultCache"""
+
+    def __init__(self, image: Image.Image, cache: ResultCache):
+        """CachedImageData class
+
+        Args:
+            image (PIL Image): The imported image file
+            cache (ResultCache): Cache of the operation results
+        """
+        super().__init__(image)
+        self.cache = cache
+
+    def lsb_encode(
+        self,
+        selected_component: ImageComponent,
+        watermark: Image.Image,
+        depth: int,
+        key: int | None = None,
+    ):
+        self.rgb_array = self.cache.cached(
+            "lsb_encode",
+            [self.rgb_array, np.asarray(watermark)],
+            lambda: self._uncached(
+                super(CachedImageData, self).lsb_encode,
+                selected_component,
+                watermark,
+                depth,
+                key,
+            ),
+            component=ImageComponent(selected_component).value,
+            depth=depth,
+            key=key,
+        )
+
+    def lsb_decode(
+        self, selected_component: ImageComponent, depth: int, key: int | None = None
+    ) -> Image:
+        bit_plane = self.cache.cached(
+            "lsb_decode",
+            [self.rgb_array],
+            lambda: np.asarray(
+                super(CachedImageData, self).lsb_decode(selected_component, depth, key)
+            ),
+            component=ImageComponent(selected_component).value,
+            depth=depth,
+            key=key,
+        )
+        return Image.fromarray(bit_plane.astype(bool))
+
+    def jpeg_compress(self, quality: int):
+        self.rgb_array = self.cache.cached(
+            "jpeg_compress",
+            [self.rgb_array],
+            lambda: self._uncached(super(CachedImageData, self).jpeg_compress, quality),
+            quality=quality,
+        )
+        self.ycbcr_array = self.rgb2ycbcr()
+
+    def image_rotate(self, angle: int):
+        self.rgb_array = self.cache.cached(
+            "image_rotate",
+            [self.original_array],
+            lambda: self._uncached(super(CachedImageData, self).image_rotate, angle),
+            angle=angle,
+        )
+        self.ycbcr_array = self.rgb2ycbcr()
+
+    def image_resize(self, percentage: int):
+        self.rgb_array = self.cache.cached(
+            "image_resize",
+            [self.original_array],
+            lambda: self._uncached(
+                super(CachedImageData, self).image_resize, percentage
+            ),
+            percentage=percentage,
+        )
+        self.ycbcr_array = self.rgb2ycbcr()
+
+    def image_flip(self, method: str):
+        self.rgb_array = self.cache.cached(
+            "image_flip",
+            [self.original_array],
+            lambda: self._uncached(super(CachedImageData, self).image_flip, method),
+            method=method,
+        )
+        self.ycbcr_array = self.rgb2ycbcr()
+
+    def _uncached(self, operation: Callable, *args) -> np.ndarray:
+        """Runs the ImageData operation and returns the resulting RGB array"""
+        operation(*args)
+        return self.rgb_array
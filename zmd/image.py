@@ -1,4 +1,5 @@
 from enum import Enum
+from functools import lru_cache, partial
 from io import BytesIO
 
 import numpy as np
@@ -11,6 +12,66 @@ class ImageComponent(Enum):
     BLUE = 2
 
 
+@lru_cache(maxsize=2)
+def keyed_permutation(key: int, shape: tuple[int, int]) -> np.ndarray:
+    """Pseudo-random permutation of the pixel positions of a component
+
+    Permutations are cached per (key, shape), generating one for a large image
+    is far more expensive than the embedding itself. Only the two most recently
+    used permutations are kept (400 MB each at 100 MP), call
+    keyed_permutation.cache_clear() to release them.
+
+    The permutation is a shuffle by the legacy np.random.RandomState seeded with
+    the 32-bit words of the key. Its stream is frozen by NumPy (NEP 19), so
+    watermarks stay decodable across NumPy versions.
+
+    Args:
+        key (int): Non-negative secret key seeding the permutation
+        shape (tuple[int, int]): Shape of the image component
+
+    Raises:
+        ValueError: In case of a negative key
+
+    Returns:
+        np.ndarray: Read-only permutation of the flattened pixel indices
+    """
+    if key < 0:
+        raise ValueError("Permutation key has to be non-negative")
+    seed = [
+        (key >> shift) & 0xFFFFFFFF for shift in range(0, key.bit_length() or 1, 32)
+    ]
+    size = shape[0] * shape[1]
+    # míchání na místě v nejmenším dostatečném typu, bez int64 mezivýsledku
+    permutation = np.arange(size, dtype=np.min_scalar_type(max(size - 1, 0)))
+    np.random.RandomState(seed).shuffle(permutation)
+    permutation.flags.writeable = False
+    return permutation
+
+
+def tile_watermark(
+    watermark: Image.Image | np.ndarray, shape: tuple[int, int], row_offset: int = 0
+) -> np.ndarray:
+    """Repeats the watermark over the component shape the way the encoder embeds it
+
+    Args:
+        watermark (Image | np.ndarray): Watermark image or its pixel array
+        shape (tuple[int, int]): Shape of the image component
+        row_offset (optional): Row of the whole image the component starts at.
+            Defaults to 0.
+
+    Returns:
+        np.ndarray: Watermark tiled to the given shape
+    """
+    watermark_array = np.asarray(watermark, dtype=np.uint8)
+    # posun vzoru tak, aby pás navazoval na předchozí řádky
+    watermark_array = np.roll(watermark_array, -row_offset, axis=0)
+
+    return np.tile(
+        watermark_array,
+        np.array(shape) // np.array(np.shape(watermark_array)) + 1,
+    )[tuple(map(slice, shape))]
+
+
 class ImagePSNR:
     def calculate_psnr(img1: Image, img2: Image, max_value: int = 255) -> float:
         """Calculating peak signal-to-noise ratio (PSNR) between two images.
@@ -26,6 +87,19 @@ class ImagePSNR:
         img1_arr = np.asarray(img1, dtype=np.float32).copy()
         img2_arr = np.asarray(img2, dtype=np.float32).copy()
         mse = np.mean((img1_arr - img2_arr) ** 2)
+        return ImagePSNR.mse2psnr(mse, max_value)
+
+    @staticmethod
+    def mse2psnr(mse: float, max_value: int = 255) -> float:
+        """Converts mean squared error to PSNR
+
+        Args:
+            mse: Mean squared error between two images
+            max_value (optional): Maximum possible value in the image. Defaults to 255.
+
+        Returns:
+            float: Calculated PSNR
+        """
         if mse == 0:
             return 100
         return float(20 * np.log10(max_value / (np.sqrt(mse))))
@@ -75,12 +149,23 @@ class ImageData:
         Returns:
             np.ndarray: Numpy 3D array containing the image YCbCr components
         """
+        return self.convert_rgb2ycbcr(self.rgb_array)
+
+    @staticmethod
+    def convert_rgb2ycbcr(rgb_array: np.ndarray) -> np.ndarray:
+        """Computes the YCbCr components of the given RGB array
+
+        Args:
+            rgb_array (np.ndarray): Numpy 3D array containing RGB components
+
+        Returns:
+            np.ndarray: Numpy 3D array containing the YCbCr components
+        """
         xform = np.array(
             [[0.299, 0.587, 0.114], [-0.1687, -0.3313, 0.5], [0.5, -0.4187, -0.0813]]
         )
-        ycbcr = self.rgb_array.dot(xform.T)
+        ycbcr = rgb_array.dot(xform.T)
         ycbcr[:, :, [1, 2]] += 128
-        print(type(np.uint8(ycbcr)))
         return np.uint8(ycbcr)
 
     def ycbcr2rgb(self) -> np.ndarray:
@@ -95,7 +180,6 @@ class ImageData:
         rgb = rgb.dot(xform.T)
         np.putmask(rgb, rgb > 255, 255)
         np.putmask(rgb, rgb < 0, 0)
-        print(type(np.uint8(rgb)))
         return np.uint8(rgb)
 
     def lsb_encode(
@@ -103,6 +187,7 @@ class ImageData:
         selected_component: ImageComponent,
         watermark: Image,
         depth: int,
+        key: int | None = None,
     ):
         """Least Significant Bit watermark encoding
 
@@ -110,29 +195,39 @@ class ImageData:
             selected_component (ImageComponent): The image component to encode watermark in (Red/Green/Blue)
             watermark (str): Watermark string
             depth (int): The bit depth
+            key (optional): Secret key scattering the watermark bits over
+                pseudo-random pixel positions. Defaults to None (fixed positions).
 
         Raises:
             ValueError: In case of invalid ImageComponent input
         """
+        encode = self.encode_lsb_image
+        if key is not None:
+            encode = partial(self.encode_lsb_image_keyed, key=key)
+
         match selected_component:
             case ImageComponent.RED:
-                self.rgb_array[:, :, 0] = self.encode_lsb_image(
+                self.rgb_array[:, :, 0] = encode(
                     self.rgb_array[:, :, 0], watermark, depth
                 )
 
             case ImageComponent.GREEN:
-                self.rgb_array[:, :, 1] = self.encode_lsb_image(
+                self.rgb_array[:, :, 1] = encode(
                     self.rgb_array[:, :, 1], watermark, depth
                 )
             case ImageComponent.BLUE:
-                self.rgb_array[:, :, 2] = self.encode_lsb_image(
+                self.rgb_array[:, :, 2] = encode(
                     self.rgb_array[:, :, 2], watermark, depth
                 )
             case _:
                 raise ValueError("Invalid ImageComponent input")
 
     def encode_lsb_image(
-        self, component: np.ndarray, watermark: Image, depth: int
+        self,
+        component: np.ndarray,
+        watermark: Image.Image | np.ndarray,
+        depth: int,
+        row_offset: int = 0,
     ) -> np.ndarray:
         """Single component LSB image encoding
 
@@ -140,6 +235,8 @@ class ImageData:
             component (np.ndarray): The selected component array
             watermark_img (str): Watermark string
             depth (int): The bit depth
+            row_offset (optional): Row of the whole image the component starts at,
+                used when encoding a band of rows. Defaults to 0.
 
         Raises:
             ValueError: In case the picture is too small to encode the message
@@ -147,13 +244,7 @@ class ImageData:
         Returns:
             np.ndarray: New image component with encoded data.
         """
-        watermark.convert("1")
-        watermark_array = np.asarray(watermark, dtype=np.uint8)
-
-        tiled_watermark = np.tile(
-            watermark_array,
-            np.array(component.shape) // np.array(np.shape(watermark_array)) + 1,
-        )[tuple(map(slice, component.shape))]
+        tiled_watermark = tile_watermark(watermark, component.shape, row_offset)
 
         # převod pole intů na pole bitů
         binary_component = np.unpackbits(component, axis=1)
@@ -162,12 +253,41 @@ class ImageData:
 
         return np.packbits(binary_component, axis=1)
 
-    def lsb_decode(self, selected_component: ImageComponent, depth: int) -> Image:
+    def encode_lsb_image_keyed(
+        self, component: np.ndarray, watermark: Image, depth: int, key: int
+    ) -> np.ndarray:
+        """Single component LSB image encoding at keyed pseudo-random positions
+
+        Args:
+            component (np.ndarray): The selected component array
+            watermark (Image): Watermark image
+            depth (int): The bit depth
+            key (int): Secret key of the pixel permutation
+
+        Returns:
+            np.ndarray: New image component with encoded data.
+        """
+        tiled_watermark = tile_watermark(watermark, component.shape) != 0
+        permutation = keyed_permutation(key, component.shape)
+
+        # rozházení bitů vodoznaku na pozice dané permutací
+        scattered = np.empty(component.size, dtype=np.uint8)
+        scattered[permutation] = tiled_watermark.ravel()
+        shift = 7 - depth
+        return (component & np.uint8(~(1 << shift) & 0xFF)) | (
+            scattered.reshape(component.shape) << shift
+        )
+
+    def lsb_decode(
+        self, selected_component: ImageComponent, depth: int, key: int | None = None
+    ) -> Image:
         """Least Significant Bit watermark decoding
 
         print(i)
             selected_component (ImageComponent): The image component to encode watermark in (Red/Green/Blue)
             depth (int): The bit depth
+            key (optional): Secret key the watermark was encoded with.
+                Defaults to None (fixed positions).
 
         Raises:
             ValueError: In case of invalid ImageComponent input
@@ -175,14 +295,18 @@ class ImageData:
         Returns:
             str: The decoded string
         """
+        decode = self.decode_lsb_image
+        if key is not None:
+            decode = partial(self.decode_lsb_image_keyed, key=key)
+
         match selected_component:
             case ImageComponent.RED:
-                data = self.decode_lsb_image(self.rgb_array[:, :, 0], depth)
+                data = decode(self.rgb_array[:, :, 0], depth)
 
             case ImageComponent.GREEN:
-                data = self.decode_lsb_image(self.rgb_array[:, :, 1], depth)
+                data = decode(self.rgb_array[:, :, 1], depth)
             case ImageComponent.BLUE:
-                data = self.decode_lsb_image(self.rgb_array[:, :, 2], depth)
+                data = decode(self.rgb_array[:, :, 2], depth)
             case _:
                 raise ValueError("Invalid ImageComponent input")
 
@@ -198,17 +322,54 @@ class ImageData:
         Returns:
             str: The decoded string
         """
-        binary_component = np.unpackbits(component, axis=1)
-        # extrakce bitové hladiny
-        data_array = binary_component[:, depth::8]
-
         # převod bitové hladiny do listu byte stringů
         image = Image.frombytes(
-            mode="1", size=data_array.shape[::-1], data=np.packbits(data_array, axis=1)
+            mode="1",
+            size=component.shape[::-1],
+            data=self.decode_lsb_bits(component, depth),
         )
 
         return image
 
+    def decode_lsb_bits(self, component: np.ndarray, depth: int) -> np.ndarray:
+        """Single component LSB decoding into a packed bit plane
+
+        Args:
+            component (np.ndarray): The selected component array
+            depth (int): The bit depth
+
+        Returns:
+            np.ndarray: Bit plane packed along the rows
+        """
+        binary_component = np.unpackbits(component, axis=1)
+        # extrakce bitové hladiny
+        data_array = binary_component[:, depth::8]
+
+        return np.packbits(data_array, axis=1)
+
+    def decode_lsb_image_keyed(
+        self, component: np.ndarray, depth: int, key: int
+    ) -> Image:
+        """Single component LSB decoding from keyed pseudo-random positions
+
+        Args:
+            component (np.ndarray): The selected component array
+            depth (int): The bit depth
+            key (int): Secret key of the pixel permutation
+
+        Returns:
+            Image: The decoded watermark plane in its original layout
+        """
+        permutation = keyed_permutation(key, component.shape)
+
+        # sesbírání bitů z pozic daných permutací
+        bit_plane = (component.ravel()[permutation] >> (7 - depth)) & 1
+        bit_plane = bit_plane.reshape(component.shape)
+
+        return Image.frombytes(
+            mode="1", size=component.shape[::-1], data=np.packbits(bit_plane, axis=1)
+        )
+
     def jpeg_compress(self, quality: int):
         """Compress the image by the JPEG compression algorithm
 
@@ -234,7 +395,6 @@ class ImageData:
         """
         temp_image: Image = self.original_image
         temp_image = temp_image.rotate(angle, expand=True)
-        temp_image.show()
         original_size = self.original_image.size
         original_center = (int(original_size[0] / 2), int(original_size[1] / 2))
         temp_size = temp_image.size
@@ -0,0 +1,175 @@
+import numpy as np
+from PIL import Image
+
+from zmd.image import tile_watermark
+
+# počet nastavených bitů pro každou možnou hodnotu bytu
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class BitPlaneMetrics:
+    """Similarity metrics between an extracted bit plane and reference watermarks.
+
+    All metrics work on bit planes packed row-wise by ``np.packbits(..., axis=1)``,
+    i.e. arrays of shape (height, ceil(width / 8)). References may be given as
+    a batch of shape (count, height, ceil(width / 8)) to score one extraction
+    against many watermarks in a single call.
+    """
+
+    @staticmethod
+    def pack(bit_plane: Image.Image | np.ndarray) -> np.ndarray:
+        """Packs a bit plane into bytes along its rows
+
+        Args:
+            bit_plane (Image | np.ndarray): Mode "1" Image (e.g. the output of
+                decode_lsb_image) or a 2D array of zeros and ones
+
+        Returns:
+            np.ndarray: Packed bit plane of shape (height, ceil(width / 8))
+        """
+        # nenulové hodnoty jsou nastavené bity, stejně jako v kodéru
+        bit_array = np.asarray(bit_plane) != 0
+        if bit_array.ndim != 2:
+            raise ValueError("Bit plane has to be two-dimensional")
+        return np.packbits(bit_array, axis=1)
+
+    @staticmethod
+    def tile_reference(watermark: Image.Image, shape: tuple[int, int]) -> np.ndarray:
+        """Tiles the watermark over the given shape the same way encode_lsb_image does
+        and packs the result
+
+        Args:
+            watermark (Image): The reference watermark
+            shape (tuple[int, int]): Shape (height, width) of the extracted bit plane
+
+        Returns:
+            np.ndarray: Packed reference of shape (height, ceil(width / 8))
+        """
+        return np.packbits(tile_watermark(watermark, shape) != 0, axis=1)
+
+    @staticmethod
+    def popcount(packed: np.ndarray) -> np.ndarray:
+        """Counts the set bits of the packed bit planes
+
+        Args:
+            packed (np.ndarray): Packed bit plane(s), the last two axes are summed
+
+        Returns:
+            np.ndarray: Number of set bits per bit plane
+        """
+        return POPCOUNT_TABLE[packed].sum(axis=(-2, -1), dtype=np.int64)
+
+    @staticmethod
+    def hamming_distance(extracted: np.ndarray, references: np.ndarray) -> np.ndarray:
+        """Number of differing bits between the extracted plane and the references
+
+        Args:
+            extracted (np.ndarray): Packed extracted bit plane
+            references (np.ndarray): Packed reference or a batch of references
+
+        Returns:
+            np.ndarray: Hamming distance for each reference
+        """
+        BitPlaneMetrics._check_shapes(extracted, references)
+        return BitPlaneMetrics.popcount(np.bitwise_xor(extracted, references))
+
+    @staticmethod
+    def bit_error_rate(
+        extracted: np.ndarray, references: np.ndarray, width: int
+    ) -> np.ndarray:
+        """Calculating bit error rate (BER) between the extracted plane and the references
+
+        Args:
+            extracted (np.ndarray): Packed extracted bit plane
+            references (np.ndarray): Packed reference or a batch of references
+            width (int): Width of the unpacked bit plane in pixels
+
+        Raises:
+            ValueError: In case the width does not fit the packed width
+
+        Returns:
+            np.ndarray: Ratio of differing bits for each reference
+        """
+        BitPlaneMetrics._check_width(extracted, width)
+        distance = BitPlaneMetrics.hamming_distance(extracted, references)
+        return distance / (extracted.shape[-2] * width)
+
+    @staticmethod
+    def normalized_correlation(
+        extracted: np.ndarray, references: np.ndarray
+    ) -> np.ndarray:
+        """Calculating normalized correlation (NC) between the extracted plane
+        and the references, sum(w * w') / sqrt(sum(w^2) * sum(w'^2))
+
+        Args:
+            extracted (np.ndarray): Packed extracted bit plane
+            references (np.ndarray): Packed reference or a batch of references
+
+        Returns:
+            np.ndarray: Normalized correlation for each reference, 0 when
+                one of the planes is empty
+        """
+        BitPlaneMetrics._check_shapes(extracted, references)
+        common = BitPlaneMetrics.popcount(np.bitwise_and(extracted, references))
+        norm = np.sqrt(
+            BitPlaneMetrics.popcount(extracted)
+            * BitPlaneMetrics.popcount(references).astype(np.float64)
+        )
+        return np.divide(common, norm, out=np.zeros(np.shape(norm)), where=norm != 0)
+
+    @staticmethod
+    def ber_map(
+        extracted: np.ndarray,
+        references: np.ndarray,
+        tile_size: tuple[int, int],
+        width: int,
+    ) -> np.ndarray:
+        """Calculating bit error rate for each tile of the bit plane
+
+        Args:
+            extracted (np.ndarray): Packed extracted bit plane
+            references (np.ndarray): Packed reference or a batch of references
+            tile_size (tuple[int, int]): Tile (height, width) in pixels,
+                the width has to be a multiple of 8
+            width (int): Width of the unpacked bit plane in pixels
+
+        Raises:
+            ValueError: In case the tile width is not a multiple of 8 or the width
+                does not fit the packed width
+
+        Returns:
+            np.ndarray: BER map of shape (..., tiles_y, tiles_x), edge tiles
+                are evaluated over their actual size
+        """
+        tile_height, tile_width = tile_size
+        if tile_height <= 0 or tile_width <= 0 or tile_width % 8:
+            raise ValueError("Tile width has to be a positive multiple of 8")
+        BitPlaneMetrics._check_shapes(extracted, references)
+        BitPlaneMetrics._check_width(extracted, width)
+        height, packed_width = extracted.shape[-2:]
+
+        errors = POPCOUNT_TABLE[np.bitwise_xor(extracted, references)]
+        row_starts = np.arange(0, height, tile_height)
+        col_starts = np.arange(0, packed_width, tile_width // 8)
+        errors = np.add.reduceat(errors, row_starts, axis=-2, dtype=np.int64)
+        errors = np.add.reduceat(errors, col_starts, axis=-1)
+
+        tile_rows = np.minimum(tile_height, height - row_starts)
+        tile_cols = np.minimum(tile_width, width - col_starts * 8)
+        return errors / np.outer(tile_rows, tile_cols)
+
+    @staticmethod
+    def _check_shapes(extracted: np.ndarray, references: np.ndarray):
+        if extracted.ndim != 2 or extracted.shape != references.shape[-2:]:
+            raise ValueError(
+                f"Reference shape {references.shape} does not match "
+                f"the extracted bit plane shape {extracted.shape}"
+            )
+
+    @staticmethod
+    def _check_width(extracted: np.ndarray, width: int):
+        packed_width = extracted.shape[-1]
+        if not (packed_width - 1) * 8 < width <= packed_width * 8:
+            raise ValueError(
+                f"Width {width} does not match the packed width {packed_width}"
+            )
@@ -0,0 +1,154 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from zmd.image import ImageComponent, ImageData, ImagePSNR
+
+
+class BandExecutor:
+    """Runs the ImageData kernels on row bands of the image in a thread pool
+
+    NumPy releases the GIL inside the kernels, so the bands are processed in
+    parallel. Every band writes into its own rows of a preallocated output buffer.
+    """
+
+    def __init__(self, threads: int | None = None, min_band_rows: int = 64):
+        """BandExecutor class
+
+        Args:
+            threads (optional): Number of worker threads. Defaults to os.cpu_count().
+            min_band_rows (optional): Smallest band height, smaller images are
+                split into fewer bands. Defaults to 64.
+        """
+        self.threads = threads or os.cpu_count() or 1
+        self.min_band_rows = min_band_rows
+        self.pool = ThreadPoolExecutor(max_workers=self.threads)
+
+    def __enter__(self) -> "BandExecutor":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shuts the thread pool down"""
+        self.pool.shutdown()
+
+    def bands(self, height: int) -> list[slice]:
+        """Splits the rows of an image into bands, one per thread
+
+        Args:
+            height (int): Number of image rows
+
+        Returns:
+            list[slice]: Row slices covering the image
+        """
+        count = max(1, min(self.threads, height // self.min_band_rows))
+        bounds = np.linspace(0, height, count + 1).astype(int).tolist()
+        return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    def map_bands(self, function, height: int) -> list:
+        """Calls the function with every row band in the thread pool
+
+        Args:
+            function (Callable[[slice], Any]): Band kernel
+            height (int): Number of image rows
+
+        Returns:
+            list: Kernel results in band order
+        """
+        return list(self.pool.map(function, self.bands(height)))
+
+    def lsb_encode(
+        self,
+        image_data: ImageData,
+        selected_component: ImageComponent,
+        watermark: Image.Image,
+        depth: int,
+    ):
+        """Banded ImageData.lsb_encode, the RGB array is updated in place
+
+        Args:
+            image_data (ImageData): The image to encode the watermark in
+            selected_component (ImageComponent): The image component to encode
+                watermark in (Red/Green/Blue)
+            watermark (Image): Watermark image
+            depth (int): The bit depth
+        """
+        component = image_data.rgb_array[:, :, ImageComponent(selected_component).value]
+        # načtení obrázku jednou, líné načítání Pillow není bezpečné mezi vlákny
+        watermark_array = np.asarray(watermark)
+
+        def encode_band(rows: slice):
+            component[rows] = image_data.encode_lsb_image(
+                component[rows], watermark_array, depth, row_offset=rows.start
+            )
+
+        self.map_bands(encode_band, component.shape[0])
+
+    def lsb_decode(
+        self, image_data: ImageData, selected_component: ImageComponent, depth: int
+    ) -> Image.Image:
+        """Banded ImageData.lsb_decode
+
+        Args:
+            image_data (ImageData): The image to decode the watermark from
+            selected_component (ImageComponent): The image component to decode
+                watermark from (Red/Green/Blue)
+            depth (int): The bit depth
+
+        Returns:
+            Image: The decoded bit plane
+        """
+        component = image_data.rgb_array[:, :, ImageComponent(selected_component).value]
+        packed = np.empty(
+            (component.shape[0], -(-component.shape[1] // 8)), dtype=np.uint8
+        )
+
+        def decode_band(rows: slice):
+            packed[rows] = image_data.decode_lsb_bits(component[rows], depth)
+
+        self.map_bands(decode_band, component.shape[0])
+        return Image.frombytes(mode="1", size=component.shape[::-1], data=packed)
+
+    def rgb2ycbcr(self, image_data: ImageData) -> np.ndarray:
+        """Banded ImageData.rgb2ycbcr
+
+        Args:
+            image_data (ImageData): The image to convert
+
+        Returns:
+            np.ndarray: Numpy 3D array containing the image YCbCr components
+        """
+        ycbcr = np.empty(image_data.rgb_array.shape, dtype=np.uint8)
+
+        def convert_band(rows: slice):
+            ycbcr[rows] = image_data.convert_rgb2ycbcr(image_data.rgb_array[rows])
+
+        self.map_bands(convert_band, ycbcr.shape[0])
+        return ycbcr
+
+    def calculate_psnr(
+        self, img1: Image.Image, img2: Image.Image, max_value: int = 255
+    ) -> float:
+        """Banded ImagePSNR.calculate_psnr
+
+        Args:
+            img1: The first Image
+            img2: The second Image
+            max_value (optional): Maximum possible value in the image. Defaults to 255.
+
+        Returns:
+            float: Calculated PSNR
+        """
+        img1_arr = np.asarray(img1)
+        img2_arr = np.asarray(img2)
+
+        def squared_error_band(rows: slice) -> float:
+            difference = img1_arr[rows].astype(np.float32) - img2_arr[rows]
+            return float(np.sum(difference**2, dtype=np.float64))
+
+        squared_error = sum(self.map_bands(squared_error_band, img1_arr.shape[0]))
+        return ImagePSNR.mse2psnr(squared_error / img1_arr.size, max_value)
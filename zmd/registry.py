@@ -0,0 +1,257 @@
+import os
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+from zmd.metrics import POPCOUNT_TABLE
+
+# počet nastavených bitů pro každou 16bitovou hodnotu podřetězce
+SUBSTRING_POPCOUNT = (
+    POPCOUNT_TABLE[np.arange(1 << 16) & 0xFF] + POPCOUNT_TABLE[np.arange(1 << 16) >> 8]
+)
+
+
+class WatermarkRegistry:
+    """Registry of per-customer watermarks for leak attribution
+
+    Every watermark is stored as a packed bit signature of one watermark period.
+    Nearest-match queries use multi-index hashing: the signature is split into
+    16-bit substrings, and a signature within Hamming distance r of the query
+    shares at least one substring within distance r // substring_count with it.
+    Candidates are gathered from the substring tables by increasing substring
+    radius and verified with the full Hamming distance.
+    """
+
+    def __init__(self, period: tuple[int, int]):
+        """WatermarkRegistry class
+
+        Args:
+            period (tuple[int, int]): Watermark period (height, width) in pixels
+
+        Attributes:
+            names (np.ndarray): Customer names, one per signature
+            signatures (np.ndarray): Packed signatures of shape (count, signature_bytes)
+            keys (np.ndarray): Sorted substring keys, substring index * 2^16 + value
+            key_ids (np.ndarray): Signature index for each substring key
+        """
+        self.period = tuple(period)
+        packed_width = -(-self.period[1] // 8)
+        # zarovnání na celé 16bitové podřetězce
+        self.signature_bytes = -(-self.period[0] * packed_width // 2) * 2
+        self.substring_count = self.signature_bytes // 2
+
+        self.names = np.empty(0, dtype=str)
+        self.signatures = np.empty((0, self.signature_bytes), dtype=np.uint8)
+        self.keys = np.empty(0, dtype=np.uint32)
+        self.key_ids = np.empty(0, dtype=np.uint32)
+        self._index_stale = False
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def signature(self, bit_plane: Image.Image | np.ndarray) -> np.ndarray:
+        """Folds a bit plane onto the watermark period by majority vote and packs it
+
+        Args:
+            bit_plane (Image | np.ndarray): The watermark itself or an extracted
+                bit plane (e.g. the output of decode_lsb_image)
+
+        Returns:
+            np.ndarray: Packed signature of length signature_bytes
+        """
+        # nenulové hodnoty jsou nastavené bity, stejně jako v kodéru
+        bits = (np.asarray(bit_plane) != 0).astype(np.uint32)
+        if bits.ndim != 2:
+            raise ValueError("Bit plane has to be two-dimensional")
+
+        period_height, period_width = self.period
+        repeats = -(-np.array(bits.shape) // np.array(self.period))
+        padded_shape = tuple(repeats * np.array(self.period))
+        ones = np.zeros(padded_shape, dtype=np.uint32)
+        counts = np.zeros(padded_shape, dtype=np.uint32)
+        ones[: bits.shape[0], : bits.shape[1]] = bits
+        counts[: bits.shape[0], : bits.shape[1]] = 1
+
+        # sečtení hlasů ze všech opakování periody
+        fold_shape = (repeats[0], period_height, repeats[1], period_width)
+        ones = ones.reshape(fold_shape).sum(axis=(0, 2))
+        counts = counts.reshape(fold_shape).sum(axis=(0, 2))
+
+        packed = np.packbits(ones * 2 > counts, axis=1).ravel()
+        signature = np.zeros(self.signature_bytes, dtype=np.uint8)
+        signature[: packed.size] = packed
+        return signature
+
+    def register(self, name: str, watermark: Image.Image | np.ndarray):
+        """Adds a customer watermark to the registry
+
+        Args:
+            name (str): Customer name
+            watermark (Image | np.ndarray): The customer watermark
+        """
+        self.register_many([name], [watermark])
+
+    def register_many(
+        self, names: list[str], watermarks: list[Image.Image | np.ndarray]
+    ):
+        """Adds several customer watermarks to the registry at once
+
+        Args:
+            names (list[str]): Customer names
+            watermarks (list[Image | np.ndarray]): The customer watermarks
+        """
+        if len(names) != len(watermarks):
+            raise ValueError("Every watermark needs exactly one name")
+        signatures = np.array(
+            [self.signature(watermark) for watermark in watermarks], dtype=np.uint8
+        ).reshape(-1, self.signature_bytes)
+        self.names = np.concatenate([self.names, np.array(names, dtype=str)])
+        self.signatures = np.concatenate([self.signatures, signatures])
+        self._index_stale = True
+
+    def build_index(self):
+        """Builds the sorted substring tables of the multi-index"""
+        substrings = self.signatures.view(">u2").astype(np.uint32)
+        offsets = np.arange(self.substring_count, dtype=np.uint32) << 16
+        keys = (substrings + offsets).T.ravel()
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.key_ids = (order % len(self)).astype(np.uint32)
+        self._index_stale = False
+
+    def match(
+        self, bit_plane: Image.Image | np.ndarray, k: int = 1, max_radius: int = 3
+    ) -> list[tuple[str, int]]:
+        """Finds the registered watermarks nearest to the bit plane
+
+        Args:
+            bit_plane (Image | np.ndarray): Extracted bit plane or its signature
+            k (optional): Number of matches to return. Defaults to 1.
+            max_radius (optional): Largest substring radius searched in the index
+                before falling back to a linear scan. Defaults to 3.
+
+        Returns:
+            list[tuple[str, int]]: Customer names with their Hamming distance,
+                nearest first
+        """
+        if len(self) == 0:
+            return []
+        if self._index_stale:
+            self.build_index()
+        query = np.asarray(bit_plane)
+        if query.shape != (self.signature_bytes,) or query.dtype != np.uint8:
+            query = self.signature(bit_plane)
+        k = min(k, len(self))
+
+        query_keys = query.view(">u2").astype(np.uint32) + (
+            np.arange(self.substring_count, dtype=np.uint32) << 16
+        )
+        checked = np.zeros(len(self), dtype=bool)
+        best_ids = np.empty(0, dtype=np.int64)
+        best_distances = np.empty(0, dtype=np.int64)
+
+        for radius in range(max_radius + 1):
+            masks = np.flatnonzero(SUBSTRING_POPCOUNT == radius).astype(np.uint32)
+            targets = (query_keys[:, None] ^ masks[None, :]).ravel()
+            candidates = self._lookup(targets)
+            candidates = candidates[~checked[candidates]]
+            checked[candidates] = True
+
+            best_ids, best_distances = self._keep_nearest(
+                query, np.concatenate([best_ids, candidates]), best_distances, k
+            )
+            # všechny signatury se vzdáleností pod (radius + 1) * m už byly nalezeny
+            if (
+                len(best_ids) == k
+                and best_distances[-1] < (radius + 1) * self.substring_count
+            ):
+                break
+        else:
+            best_ids, best_distances = self._keep_nearest(
+                query,
+                np.concatenate([best_ids, np.flatnonzero(~checked)]),
+                best_distances,
+                k,
+            )
+
+        return [
+            (str(self.names[i]), int(distance))
+            for i, distance in zip(best_ids, best_distances)
+        ]
+
+    def save(self, path: str):
+        """Saves the registry into a directory of .npy files
+
+        Every file is written to a temporary file and moved into place, so saving
+        over the directory a registry was loaded from keeps its memory maps valid.
+
+        Args:
+            path (str): Target directory
+        """
+        if self._index_stale:
+            self.build_index()
+        os.makedirs(path, exist_ok=True)
+        self._save_array(path, "period", np.array(self.period))
+        for attribute in ("names", "signatures", "keys", "key_ids"):
+            self._save_array(path, attribute, getattr(self, attribute))
+
+    @classmethod
+    def load(cls, path: str) -> "WatermarkRegistry":
+        """Loads a saved registry, the arrays are memory-mapped and read lazily
+
+        Args:
+            path (str): Directory written by save
+
+        Returns:
+            WatermarkRegistry: The loaded registry
+        """
+        registry = cls(tuple(np.load(os.path.join(path, "period.npy"))))
+        for attribute in ("names", "signatures", "keys", "key_ids"):
+            setattr(
+                registry,
+                attribute,
+                np.load(os.path.join(path, f"{attribute}.npy"), mmap_mode="r"),
+            )
+        return registry
+
+    @staticmethod
+    def _save_array(path: str, name: str, array: np.ndarray):
+        """Atomically writes the array into path/name.npy"""
+        descriptor, temp_path = tempfile.mkstemp(dir=path, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as temp_file:
+                np.save(temp_file, np.asarray(array), allow_pickle=False)
+            os.replace(temp_path, os.path.join(path, f"{name}.npy"))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _lookup(self, targets: np.ndarray) -> np.ndarray:
+        """Returns ids of signatures having any of the target substring keys"""
+        starts = np.searchsorted(self.keys, targets, side="left")
+        ends = np.searchsorted(self.keys, targets, side="right")
+        lengths = ends - starts
+        starts, lengths = starts[lengths > 0], lengths[lengths > 0]
+        if len(starts) == 0:
+            return np.empty(0, dtype=np.int64)
+        # indexy všech prvků v intervalech [start, end)
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        positions += np.arange(lengths.sum())
+        return np.unique(self.key_ids[positions]).astype(np.int64)
+
+    def _keep_nearest(
+        self,
+        query: np.ndarray,
+        ids: np.ndarray,
+        known_distances: np.ndarray,
+        k: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Computes distances of the new ids and keeps the k nearest"""
+        new_ids = ids[len(known_distances) :]
+        new_distances = POPCOUNT_TABLE[
+            np.bitwise_xor(self.signatures[new_ids], query)
+        ].sum(axis=1, dtype=np.int64)
+        distances = np.concatenate([known_distances, new_distances])
+        order = np.argsort(distances, kind="stable")[:k]
+        return ids[order], distances[order]